@@ -13,19 +13,24 @@ load_dotenv()
 # Configuration
 BASE_URL = "http://localhost:8080"
 SECRET = os.environ.get("RELAY_SECRET")
+AUTH_ALGORITHM = os.environ.get("RELAY_AUTH_ALGORITHM", "hmac-sha256")
 if not SECRET:
     print("❌ RELAY_SECRET not found in .env file or environment variables")
     print("   Please ensure .env file exists with RELAY_SECRET set")
     exit(1)
+SECRET_BYTES = SECRET.encode()
 
+# Valid request body, serialized once and shared by hashing and sending
+VALID_BODY = json.dumps({"gpio_pin": 23}, separators=(",", ":")).encode()
 
-def test_empty_body():
+
+def test_empty_body(session):
     """Test with empty request body"""
     print("\n=== Testing Empty Body ===")
     url = f"{BASE_URL}/relay/trigger"
 
     try:
-        response = requests.post(
+        response = session.post(
             url, data="", headers={"Content-Type": "application/json"}
         )
         print(f"Status: {response.status_code}")
@@ -34,13 +39,13 @@ def test_empty_body():
         print(f"Error: {e}")
 
 
-def test_malformed_json():
+def test_malformed_json(session):
     """Test with malformed JSON"""
     print("\n=== Testing Malformed JSON ===")
     url = f"{BASE_URL}/relay/trigger"
 
     try:
-        response = requests.post(
+        response = session.post(
             url, data='{"gpio_pin": 23', headers={"Content-Type": "application/json"}
         )
         print(f"Status: {response.status_code}")
@@ -49,30 +54,30 @@ def test_malformed_json():
         print(f"Error: {e}")
 
 
-def test_no_content_type():
+def test_no_content_type(session):
     """Test without Content-Type header"""
     print("\n=== Testing No Content-Type ===")
     url = f"{BASE_URL}/relay/trigger"
 
     try:
-        response = requests.post(url, data='{"gpio_pin": 23}')
+        response = session.post(url, data='{"gpio_pin": 23}')
         print(f"Status: {response.status_code}")
         print(f"Response: {response.text}")
     except Exception as e:
         print(f"Error: {e}")
 
 
-def test_valid_request():
+def test_valid_request(session):
     """Test with valid request"""
     print("\n=== Testing Valid Request ===")
     url = f"{BASE_URL}/relay/trigger"
 
-    # Prepare request body
-    data = {"gpio_pin": 23}
-    body = json.dumps(data)
-
     # Generate authorization hash
-    auth_hash = hmac.new(SECRET.encode(), body.encode(), hashlib.sha256).hexdigest()
+    if AUTH_ALGORITHM == "blake2s":
+        key = hashlib.sha256(SECRET_BYTES).digest()
+        auth_hash = hashlib.blake2s(VALID_BODY, key=key).hexdigest()
+    else:
+        auth_hash = hmac.new(SECRET_BYTES, VALID_BODY, hashlib.sha256).hexdigest()
 
     # Prepare headers
     headers = {
@@ -81,7 +86,7 @@ def test_valid_request():
     }
 
     try:
-        response = requests.post(url, data=body, headers=headers)
+        response = session.post(url, data=VALID_BODY, headers=headers)
         print(f"Status: {response.status_code}")
         print(f"Response: {response.text}")
     except Exception as e:
@@ -92,10 +97,12 @@ def main():
     print("Raspberry Pi Relay Module Debug Test")
     print("=" * 40)
 
-    test_empty_body()
-    test_malformed_json()
-    test_no_content_type()
-    test_valid_request()
+    # One session for all tests so they reuse a single keep-alive connection
+    with requests.Session() as session:
+        test_empty_body(session)
+        test_malformed_json(session)
+        test_no_content_type(session)
+        test_valid_request(session)
 
 
 if __name__ == "__main__":
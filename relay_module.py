@@ -2,15 +2,22 @@
 
 import time
 import signal
+import socket
+import threading
+import uuid
 import sys
 import os
 import hashlib
 import hmac
+import gzip
 import RPi.GPIO as GPIO
 import json
+import re
 import logging
+import email.utils
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 from dotenv import load_dotenv
 
@@ -28,16 +35,184 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Configuration
-SUPPORTED_GPIO_PINS = [23, 18]  # Supported GPIO pins for relay control
+SUPPORTED_GPIO_PINS = (23, 18)  # Supported GPIO pins for relay control
+SUPPORTED_GPIO_PIN_SET = frozenset(SUPPORTED_GPIO_PINS)  # For per-request lookups
 HOST = "0.0.0.0"
 PORT = 8080
 AUTHORIZATION_SECRET = os.environ.get(
     "RELAY_SECRET", "default_secret_change_me"
 )  # Set via .env file or environment variable
+SECRET_BYTES = AUTHORIZATION_SECRET.encode()
+AUTH_ALGORITHM = os.environ.get(
+    "RELAY_AUTH_ALGORITHM", "hmac-sha256"
+)  # "hmac-sha256" (default) or "blake2s"; clients must use the same one
 PULSE_DURATION = 0.25  # Duration in seconds to keep GPIO LOW
+PULSE_TOLERANCE = 0.05  # Overshoot in seconds before a pulse is logged as late
+PULSE_RELEASE_DELAY = 0.25  # Seconds a pin stays HIGH before it can pulse again
+MAX_BODY_SIZE = 256  # Largest accepted request body in bytes
+
+# Keyed once at startup; copying it per request skips the key setup
+if AUTH_ALGORITHM == "hmac-sha256":
+    AUTH_TEMPLATE = hmac.new(SECRET_BYTES, digestmod=hashlib.sha256)
+elif AUTH_ALGORITHM == "blake2s":
+    # Keyed BLAKE2s hashes the body in a single pass (no HMAC inner/outer
+    # hash) and is fast on 32-bit ARM; the key is derived to fit 32 bytes
+    AUTH_TEMPLATE = hashlib.blake2s(key=hashlib.sha256(SECRET_BYTES).digest())
+else:
+    logger.error(f"Unsupported RELAY_AUTH_ALGORITHM: {AUTH_ALGORITHM}")
+    sys.exit(1)
+AUTH_HASH_LENGTH = AUTH_TEMPLATE.digest_size * 2  # Hex characters in the header
+
+# (second, ISO timestamp, HTTP date) reused by all responses in the same second
+TIMESTAMP_CACHE = (0, "", "")
+
+
+def cached_timestamps():
+    """Return the (second, ISO timestamp, HTTP date) tuple for the current second"""
+    global TIMESTAMP_CACHE
+    now = int(time.time())
+    if TIMESTAMP_CACHE[0] != now:
+        TIMESTAMP_CACHE = (
+            now,
+            datetime.fromtimestamp(now).isoformat(),
+            email.utils.formatdate(now, usegmt=True),
+        )
+    return TIMESTAMP_CACHE
+
+
+def current_timestamp():
+    """Return the current local time as an ISO 8601 string, cached per second"""
+    return cached_timestamps()[1]
+
+
+def current_http_date():
+    """Return the current time formatted for the Date header, cached per second"""
+    return cached_timestamps()[2]
+
+
+def accepts_gzip(accept_encoding):
+    """Return True if an Accept-Encoding header allows gzip (q-value above 0)"""
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() != "gzip":
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
+
+
+def timestamped_response_prefix(response):
+    """Serialize a static response dict up to the opening quote of its timestamp"""
+    return json.dumps(response)[:-1].encode() + b', "timestamp": "'
+
+
+# Health and status bodies only differ by timestamp, so serialize the rest once
+HEALTH_RESPONSE_PREFIX = timestamped_response_prefix(
+    {
+        "status": "healthy",
+        "service": "raspberry-pi-relay-module",
+    }
+)
+STATUS_RESPONSE_PREFIX = timestamped_response_prefix(
+    {
+        "status": "running",
+        "service": "raspberry-pi-relay-module",
+        "supported_gpio_pins": SUPPORTED_GPIO_PINS,
+        "pulse_duration": PULSE_DURATION,
+    }
+)
+RESPONSE_SUFFIX = b'"}'
+
+# Request bodies are always {"gpio_pin": <int>}; JSON whitespace only
+GPIO_PIN_BODY_PATTERN = re.compile(
+    rb'[ \t\n\r]*\{[ \t\n\r]*"gpio_pin"[ \t\n\r]*:[ \t\n\r]*'
+    rb"(0|[1-9][0-9]*)[ \t\n\r]*\}[ \t\n\r]*"
+)
+
+
+def setup_gpio():
+    """Configure every supported pin as an output once, idle HIGH (relay off)"""
+    GPIO.setmode(GPIO.BCM)
+    for gpio_pin in SUPPORTED_GPIO_PINS:
+        GPIO.setup(gpio_pin, GPIO.OUT, initial=GPIO.HIGH)
+
+
+# Pulses run in the background so requests don't wait out PULSE_DURATION;
+# each pin has its own single worker, so one relay never delays the other
+PULSE_EXECUTORS = {
+    gpio_pin: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"pulse-{gpio_pin}")
+    for gpio_pin in SUPPORTED_GPIO_PINS
+}
+# Last pulse submitted per pin; a pin takes no new trigger until it is done
+PULSE_FUTURES = {}
+PULSE_FUTURES_LOCK = threading.Lock()
+
+
+def pulse_gpio(gpio_pin, request_id):
+    """Pull the GPIO pin LOW for PULSE_DURATION seconds to trigger the relay"""
+    try:
+        # Set pin LOW to trigger the relay
+        GPIO.output(gpio_pin, GPIO.LOW)
+        pulse_started = time.monotonic()
+        try:
+            # Wait for specified duration
+            time.sleep(PULSE_DURATION)
+        finally:
+            # Set pin HIGH
+            GPIO.output(gpio_pin, GPIO.HIGH)
+            pulse_length = time.monotonic() - pulse_started
+
+        # time.sleep() only guarantees a minimum; scheduler or GC stalls on a
+        # loaded Pi can stretch the pulse, so report how long it really was
+        if pulse_length > PULSE_DURATION + PULSE_TOLERANCE:
+            logger.warning(
+                f"Relay pulse on GPIO {gpio_pin} lasted {pulse_length:.3f}s "
+                f"instead of {PULSE_DURATION}s ({request_id})"
+            )
+        logger.info(
+            f"Relay pulse completed on GPIO {gpio_pin} in {pulse_length:.3f}s "
+            f"({request_id})"
+        )
+
+        # Keep the pin released for a moment so the next pulse on this relay
+        # is seen as a separate press instead of extending this one
+        time.sleep(PULSE_RELEASE_DELAY)
+
+    except Exception as e:
+        logger.error(f"Error pulsing GPIO {gpio_pin} ({request_id}): {e}")
+
+
+def submit_pulse(gpio_pin, request_id):
+    """Schedule a pulse on the pin, or return False while one is still pending"""
+    with PULSE_FUTURES_LOCK:
+        pending = PULSE_FUTURES.get(gpio_pin)
+        if pending is not None and not pending.done():
+            return False
+        PULSE_FUTURES[gpio_pin] = PULSE_EXECUTORS[gpio_pin].submit(
+            pulse_gpio, gpio_pin, request_id
+        )
+        return True
 
 
 class RelayModuleHandler(BaseHTTPRequestHandler):
+    # Read the socket through a 16 KB buffer; wfile stays unbuffered so the
+    # interim "100 Continue" reaches the client before the body is read, and
+    # write_response() already sends each response in a single write
+    rbufsize = 16384
+    # Keep connections open between requests (every response carries a
+    # Content-Length), disable Nagle so small responses aren't delayed, and
+    # drop idle connections so they don't hold a thread forever
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    timeout = 30
+
     def do_POST(self):
         """Handle POST requests for relay control"""
         if self.path == "/relay/trigger":
@@ -56,193 +231,245 @@ class RelayModuleHandler(BaseHTTPRequestHandler):
         else:
             self.send_error(404, "Not Found")
 
-    def verify_authorization(self):
-        """Verify the authorization hash in the request header"""
-        auth_header = self.headers.get("Authorization")
-        if not auth_header:
-            return False
-
-        try:
-            # Expected format: "Bearer <hash>"
-            if not auth_header.startswith("Bearer "):
-                return False
+    def parse_authorization(self):
+        """Return the digest from a well-formed "Bearer <hash>" header, else None"""
+        auth_header = self.headers.get("Authorization", "")
 
-            provided_hash = auth_header[7:]  # Remove "Bearer " prefix
-
-            # Get request body for hash verification
-            content_length = int(self.headers.get("Content-Length", 0))
-            body = self.rfile.read(content_length).decode("utf-8")
-
-            # Log authorization attempt for debugging
-            logger.info(
-                f"Authorization attempt - Content-Length: {content_length}, Body: '{body}'"
-            )
-
-            # Calculate expected hash
-            expected_hash = hmac.new(
-                AUTHORIZATION_SECRET.encode(), body.encode(), hashlib.sha256
-            ).hexdigest()
-
-            return hmac.compare_digest(provided_hash, expected_hash)
-
-        except Exception as e:
-            logger.error(f"Authorization verification error: {e}")
-            return False
-
-    def verify_authorization_with_body(self, body):
-        """Verify the authorization hash in the request header using provided body"""
-        auth_header = self.headers.get("Authorization")
-        if not auth_header:
-            return False
+        # Expected format: "Bearer <hash>"
+        if not auth_header.startswith("Bearer "):
+            return None
 
+        provided_hash = auth_header[7:]  # Remove "Bearer " prefix
+        if len(provided_hash) != AUTH_HASH_LENGTH:
+            return None
         try:
-            # Expected format: "Bearer <hash>"
-            if not auth_header.startswith("Bearer "):
-                return False
+            return bytes.fromhex(provided_hash)
+        except ValueError:
+            return None
 
-            provided_hash = auth_header[7:]  # Remove "Bearer " prefix
+    def verify_authorization(self, provided_digest, body):
+        """Verify the provided digest against the body bytes"""
+        # Calculate expected hash from a copy of the pre-keyed state
+        mac = AUTH_TEMPLATE.copy()
+        mac.update(body)
 
-            # Log authorization attempt for debugging
-            logger.info(f"Authorization attempt with provided body: '{body}'")
+        return hmac.compare_digest(provided_digest, mac.digest())
 
-            # Calculate expected hash
-            expected_hash = hmac.new(
-                AUTHORIZATION_SECRET.encode(), body.encode(), hashlib.sha256
-            ).hexdigest()
-
-            return hmac.compare_digest(provided_hash, expected_hash)
-
-        except Exception as e:
-            logger.error(f"Authorization verification error: {e}")
-            return False
+    def send_unauthorized(self):
+        """Send the 401 response for a missing or invalid authorization hash"""
+        response = {
+            "status": "error",
+            "message": "Unauthorized - Invalid or missing authorization hash",
+            "timestamp": current_timestamp(),
+        }
+        self.send_json_response(401, response)
 
     def handle_relay_trigger(self):
         """Handle relay trigger requests"""
         try:
-            # Read request body once
-            content_length = int(self.headers.get("Content-Length", 0))
-            body = self.rfile.read(content_length).decode("utf-8")
-
-            # Log the received body for debugging
-            logger.info(f"Received request body: '{body}' (length: {len(body)})")
+            # Check the header shape first so requests that cannot be authorized
+            # never get their body read or hashed
+            provided_digest = self.parse_authorization()
+            if provided_digest is None:
+                # The unread body must not be parsed as the next request
+                self.close_connection = True
+                self.send_unauthorized()
+                return
 
-            # Verify authorization using the body we just read
-            if not self.verify_authorization_with_body(body):
-                self.send_response(401)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
+            # Read request body once, kept as bytes for both HMAC and JSON parsing
+            # A negative length would make rfile.read() block until EOF
+            try:
+                content_length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                content_length = -1
+            if content_length < 0:
                 response = {
                     "status": "error",
-                    "message": "Unauthorized - Invalid or missing authorization hash",
-                    "timestamp": datetime.now().isoformat(),
+                    "message": "Invalid Content-Length header",
+                    "timestamp": current_timestamp(),
                 }
-                self.wfile.write(json.dumps(response).encode())
+                # Without a usable length the body cannot be skipped
+                self.close_connection = True
+                self.send_json_response(400, response)
                 return
 
-            # Parse request body
-            try:
-                data = json.loads(body)
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error: {e}, body: '{body}'")
-                self.send_response(400)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
+            # Reject oversized bodies before reading (and allocating) them
+            if content_length > MAX_BODY_SIZE:
+                logger.warning(f"Rejected request body of {content_length} bytes")
                 response = {
                     "status": "error",
-                    "message": f"Invalid JSON in request body: {str(e)}",
-                    "received_body": body,
-                    "timestamp": datetime.now().isoformat(),
+                    "message": f"Request body too large (max {MAX_BODY_SIZE} bytes)",
+                    "timestamp": current_timestamp(),
                 }
-                self.wfile.write(json.dumps(response).encode())
+                # The unread body must not be parsed as the next request
+                self.close_connection = True
+                self.send_json_response(413, response)
                 return
 
-            # Validate GPIO pin
-            gpio_pin = data.get("gpio_pin")
-            if not gpio_pin or gpio_pin not in SUPPORTED_GPIO_PINS:
-                self.send_response(400)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
+            try:
+                body = self.rfile.read(content_length)
+            except socket.timeout:
+                # The client stalled mid-body; that is not a server fault
+                logger.warning("Timed out reading request body")
                 response = {
                     "status": "error",
-                    "message": f"Invalid GPIO pin. Supported pins: {SUPPORTED_GPIO_PINS}",
-                    "timestamp": datetime.now().isoformat(),
+                    "message": "Timed out reading request body",
+                    "timestamp": current_timestamp(),
                 }
-                self.wfile.write(json.dumps(response).encode())
+                # The rest of the body may still arrive, so don't reuse the stream
+                self.close_connection = True
+                self.send_json_response(408, response)
                 return
 
-            logger.info(f"Received relay trigger command for GPIO {gpio_pin}")
-
-            # Set GPIO mode and pin
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setup(gpio_pin, GPIO.OUT)
+            # Log the received body for debugging
+            logger.info(f"Received request body: {body!r} (length: {len(body)})")
 
-            # Set pin LOW to trigger the relay
-            GPIO.output(gpio_pin, GPIO.LOW)
+            # Verify authorization against the body we just read
+            if not self.verify_authorization(provided_digest, body):
+                self.send_unauthorized()
+                return
 
-            # Wait for specified duration
-            time.sleep(PULSE_DURATION)
+            # Parse request body; the expected {"gpio_pin": <int>} shape is
+            # matched directly and anything else goes through the JSON parser
+            match = GPIO_PIN_BODY_PATTERN.fullmatch(body)
+            if match:
+                gpio_pin = int(match.group(1))
+            else:
+                try:
+                    data = json.loads(body)
+                except ValueError as e:
+                    # JSONDecodeError, or UnicodeDecodeError for non UTF-8 bodies
+                    logger.error(f"JSON decode error: {e}, body: {body!r}")
+                    response = {
+                        "status": "error",
+                        "message": f"Invalid JSON in request body: {str(e)}",
+                        "received_body": body.decode("utf-8", "replace"),
+                        "timestamp": current_timestamp(),
+                    }
+                    self.send_json_response(400, response)
+                    return
+
+                # Other JSON documents are tolerated as long as they carry gpio_pin
+                gpio_pin = data.get("gpio_pin") if isinstance(data, dict) else None
 
-            # Set pin HIGH
-            GPIO.output(gpio_pin, GPIO.HIGH)
+            # Validate GPIO pin
+            if not isinstance(gpio_pin, int) or gpio_pin not in SUPPORTED_GPIO_PIN_SET:
+                response = {
+                    "status": "error",
+                    "message": f"Invalid GPIO pin. Supported pins: {list(SUPPORTED_GPIO_PINS)}",
+                    "timestamp": current_timestamp(),
+                }
+                self.send_json_response(400, response)
+                return
 
-            # Clean up GPIO
-            GPIO.cleanup()
+            logger.info(f"Received relay trigger command for GPIO {gpio_pin}")
 
-            # Send success response
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.end_headers()
+            request_id = uuid.uuid4().hex
+            if not submit_pulse(gpio_pin, request_id):
+                logger.warning(f"Rejected trigger on GPIO {gpio_pin}: pulse pending")
+                response = {
+                    "status": "error",
+                    "message": f"Relay on GPIO {gpio_pin} is already being triggered",
+                    "timestamp": current_timestamp(),
+                }
+                self.send_json_response(409, response)
+                return
 
+            # Accept without waiting for the pulse; the request ID ties the
+            # response to the pulse entries in the log
             response = {
                 "status": "success",
-                "message": f"Relay triggered on GPIO {gpio_pin}",
+                "message": f"Relay trigger accepted for GPIO {gpio_pin}",
                 "gpio_pin": gpio_pin,
                 "pulse_duration": PULSE_DURATION,
-                "timestamp": datetime.now().isoformat(),
+                "request_id": request_id,
+                "timestamp": current_timestamp(),
             }
-            self.wfile.write(json.dumps(response).encode())
+            self.send_json_response(202, response)
 
-            logger.info(f"Relay trigger executed successfully on GPIO {gpio_pin}")
+            logger.info(f"Relay trigger scheduled on GPIO {gpio_pin} ({request_id})")
 
         except Exception as e:
             logger.error(f"Error executing relay trigger: {e}")
             self.send_error(500, f"Internal Server Error: {str(e)}")
 
+    def write_response(self, status_code, content_type, body, headers=()):
+        """Write the status line, headers and body with a single write"""
+        # Built here instead of through send_response/send_header so each
+        # response leaves as one buffer; a body of None sends no Content-Length
+        lines = [
+            f"{self.protocol_version} {status_code} {self.responses[status_code][0]}",
+            f"Server: {self.version_string()}",
+            f"Date: {current_http_date()}",
+        ]
+        if content_type:
+            lines.append(f"Content-type: {content_type}")
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        lines.extend(f"{name}: {value}" for name, value in headers)
+        lines.append(
+            "Connection: close" if self.close_connection else "Connection: keep-alive"
+        )
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        self.log_request(status_code)
+        self.wfile.write(head + body if body else head)
+
+    def send_json_response(self, status_code, response):
+        """Serialize a response dict and send it"""
+        self.write_response(
+            status_code, "application/json", json.dumps(response).encode()
+        )
+
     def handle_health_check(self):
         """Handle health check requests"""
-        self.send_response(200)
-        self.send_header("Content-type", "application/json")
-        self.end_headers()
-
-        response = {
-            "status": "healthy",
-            "service": "raspberry-pi-relay-module",
-            "timestamp": datetime.now().isoformat(),
-        }
-        self.wfile.write(json.dumps(response).encode())
+        body = HEALTH_RESPONSE_PREFIX + current_timestamp().encode() + RESPONSE_SUFFIX
+        self.write_response(200, "application/json", body)
 
     def handle_status(self):
         """Handle status requests"""
-        self.send_response(200)
-        self.send_header("Content-type", "application/json")
-        self.end_headers()
-
-        response = {
-            "status": "running",
-            "service": "raspberry-pi-relay-module",
-            "supported_gpio_pins": SUPPORTED_GPIO_PINS,
-            "pulse_duration": PULSE_DURATION,
-            "timestamp": datetime.now().isoformat(),
-        }
-        self.wfile.write(json.dumps(response).encode())
+        body = STATUS_RESPONSE_PREFIX + current_timestamp().encode() + RESPONSE_SUFFIX
+        self.write_response(200, "application/json", body)
 
     def handle_documentation(self):
         """Handle documentation requests"""
-        self.send_response(200)
-        self.send_header("Content-type", "text/html")
-        self.end_headers()
+        # The gzip and plain variants carry distinct ETags (Vary: Accept-Encoding)
+        use_gzip = accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        body = DOCUMENTATION_HTML_GZIP if use_gzip else DOCUMENTATION_HTML
+        etag = DOCUMENTATION_GZIP_ETAG if use_gzip else DOCUMENTATION_ETAG
+
+        # The 304 repeats the caching headers the 200 would carry
+        headers = [
+            ("ETag", etag),
+            ("Cache-Control", "no-cache"),
+            ("Vary", "Accept-Encoding"),
+        ]
+
+        # Browsers revalidate with the ETag and get an empty 304 when unchanged;
+        # "*" matches any current representation
+        if_none_match = self.headers.get("If-None-Match", "")
+        if if_none_match.strip() == "*" or etag in if_none_match:
+            self.write_response(304, None, None, headers)
+            return
+
+        if use_gzip:
+            headers.append(("Content-Encoding", "gzip"))
+        self.write_response(200, "text/html", body, headers)
+
+    def log_message(self, format, *args):
+        """Override to use our logger instead of stderr"""
+        logger.info(f"{self.address_string()} - {format % args}")
+
+
+class RelayModuleServer(ThreadingHTTPServer):
+    # socketserver listens with a backlog of 5, which drops connections when
+    # several clients poll at once; TCP_NODELAY is set per connection by the
+    # handler (disable_nagle_algorithm)
+    request_queue_size = 128
+
 
-        html_content = f"""
+# The documentation page is static, so it is encoded and compressed once at import
+DOCUMENTATION_HTML = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -250,72 +477,72 @@ class RelayModuleHandler(BaseHTTPRequestHandler):
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Raspberry Pi Relay Module API</title>
     <style>
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             max-width: 1200px;
             margin: 0 auto;
             padding: 20px;
             background-color: #f5f5f5;
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 30px;
             border-radius: 10px;
             margin-bottom: 30px;
             text-align: center;
-        }}
-        .endpoint {{
+        }
+        .endpoint {
             background: white;
             border-radius: 10px;
             padding: 20px;
             margin-bottom: 20px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .method {{
+        }
+        .method {
             display: inline-block;
             padding: 5px 10px;
             border-radius: 5px;
             color: white;
             font-weight: bold;
             margin-right: 10px;
-        }}
-        .post {{ background-color: #61affe; }}
-        .get {{ background-color: #49cc90; }}
-        .endpoint-url {{
+        }
+        .post { background-color: #61affe; }
+        .get { background-color: #49cc90; }
+        .endpoint-url {
             font-family: monospace;
             background-color: #f8f9fa;
             padding: 10px;
             border-radius: 5px;
             margin: 10px 0;
-        }}
-        .description {{
+        }
+        .description {
             color: #666;
             margin: 10px 0;
-        }}
-        .example {{
+        }
+        .example {
             background-color: #f8f9fa;
             border-left: 4px solid #667eea;
             padding: 15px;
             margin: 15px 0;
             font-family: monospace;
             white-space: pre-wrap;
-        }}
-        .auth-note {{
+        }
+        .auth-note {
             background-color: #fff3cd;
             border: 1px solid #ffeaa7;
             border-radius: 5px;
             padding: 15px;
             margin: 15px 0;
-        }}
-        .test-section {{
+        }
+        .test-section {
             background-color: #e8f5e8;
             border: 1px solid #c3e6c3;
             border-radius: 5px;
             padding: 15px;
             margin: 15px 0;
-        }}
-        .test-button {{
+        }
+        .test-button {
             background-color: #28a745;
             color: white;
             border: none;
@@ -323,11 +550,11 @@ class RelayModuleHandler(BaseHTTPRequestHandler):
             border-radius: 5px;
             cursor: pointer;
             margin: 5px;
-        }}
-        .test-button:hover {{
+        }
+        .test-button:hover {
             background-color: #218838;
-        }}
-        .response {{
+        }
+        .response {
             background-color: #f8f9fa;
             border: 1px solid #dee2e6;
             border-radius: 5px;
@@ -335,7 +562,7 @@ class RelayModuleHandler(BaseHTTPRequestHandler):
             margin: 10px 0;
             font-family: monospace;
             white-space: pre-wrap;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -354,25 +581,26 @@ class RelayModuleHandler(BaseHTTPRequestHandler):
     <div class="endpoint">
         <h2><span class="method post">POST</span> /relay/trigger</h2>
         <div class="endpoint-url">POST http://localhost:8080/relay/trigger</div>
-        <div class="description">Triggers a relay on the specified GPIO pin for a short duration.</div>
+        <div class="description">Triggers a relay on the specified GPIO pin for a short duration. The request is answered with <code>202 Accepted</code> as soon as the pulse is scheduled.</div>
 
         <h4>Request Body:</h4>
-        <div class="example">{{
+        <div class="example">{
   "gpio_pin": 23
-}}</div>
+}</div>
 
         <h4>Headers:</h4>
         <div class="example">Content-Type: application/json
 Authorization: Bearer &lt;hmac-sha256-hash&gt;</div>
 
         <h4>Response:</h4>
-        <div class="example">{{
+        <div class="example">{
   "status": "success",
-  "message": "Relay triggered on GPIO 23",
+  "message": "Relay trigger accepted for GPIO 23",
   "gpio_pin": 23,
   "pulse_duration": 0.25,
-  "timestamp": "2024-01-15T10:30:00.123456"
-}}</div>
+  "request_id": "9f1c2d3e4b5a46798a0b1c2d3e4f5a6b",
+  "timestamp": "2024-01-15T10:30:00"
+}</div>
 
         <div class="test-section">
             <h4>Test Relay Trigger:</h4>
@@ -388,11 +616,11 @@ Authorization: Bearer &lt;hmac-sha256-hash&gt;</div>
         <div class="description">Check the health status of the service.</div>
 
         <h4>Response:</h4>
-        <div class="example">{{
+        <div class="example">{
   "status": "healthy",
   "service": "raspberry-pi-relay-module",
-  "timestamp": "2024-01-15T10:30:00.123456"
-}}</div>
+  "timestamp": "2024-01-15T10:30:00"
+}</div>
 
         <div class="test-section">
             <button class="test-button" onclick="testHealth()">Test Health Check</button>
@@ -406,13 +634,13 @@ Authorization: Bearer &lt;hmac-sha256-hash&gt;</div>
         <div class="description">Get the current status and configuration of the service.</div>
 
         <h4>Response:</h4>
-        <div class="example">{{
+        <div class="example">{
   "status": "running",
   "service": "raspberry-pi-relay-module",
   "supported_gpio_pins": [23, 18],
   "pulse_duration": 0.25,
-  "timestamp": "2024-01-15T10:30:00.123456"
-}}</div>
+  "timestamp": "2024-01-15T10:30:00"
+}</div>
 
         <div class="test-section">
             <button class="test-button" onclick="testStatus()">Test Status</button>
@@ -422,38 +650,38 @@ Authorization: Bearer &lt;hmac-sha256-hash&gt;</div>
 
     <script>
         // Check service status on page load
-        window.onload = function() {{
+        window.onload = function() {
             testHealth();
-        }};
+        };
 
-        function testHealth() {{
+        function testHealth() {
             fetch('/system/health')
                 .then(response => response.json())
-                .then(data => {{
+                .then(data => {
                     document.getElementById('status').textContent = data.status;
                     document.getElementById('status').style.color = data.status === 'healthy' ? '#28a745' : '#dc3545';
                     document.getElementById('health-response').textContent = JSON.stringify(data, null, 2);
-                }})
-                .catch(error => {{
+                })
+                .catch(error => {
                     document.getElementById('status').textContent = 'Error';
                     document.getElementById('status').style.color = '#dc3545';
                     document.getElementById('health-response').textContent = 'Error: ' + error.message;
-                }});
-        }}
+                });
+        }
 
-        function testStatus() {{
+        function testStatus() {
             fetch('/system/status')
                 .then(response => response.json())
-                .then(data => {{
+                .then(data => {
                     document.getElementById('status-response').textContent = JSON.stringify(data, null, 2);
-                }})
-                .catch(error => {{
+                })
+                .catch(error => {
                     document.getElementById('status-response').textContent = 'Error: ' + error.message;
-                }});
-        }}
+                });
+        }
 
-        function testRelay(gpioPin) {{
-            const data = {{ gpio_pin: gpioPin }};
+        function testRelay(gpioPin) {
+            const data = { gpio_pin: gpioPin };
             const body = JSON.stringify(data);
 
             // Note: This is a demo - in real usage, you'd need to generate the HMAC hash
@@ -462,17 +690,16 @@ Authorization: Bearer &lt;hmac-sha256-hash&gt;</div>
                 'In real usage, you need to generate an HMAC-SHA256 hash of the request body\\n' +
                 'using the RELAY_SECRET and include it in the Authorization header.\\n\\n' +
                 'Request body: ' + body;
-        }}
+        }
     </script>
 </body>
 </html>
-        """
-
-        self.wfile.write(html_content.encode())
-
-    def log_message(self, format, *args):
-        """Override to use our logger instead of stderr"""
-        logger.info(f"{self.address_string()} - {format % args}")
+        """.encode()
+DOCUMENTATION_HTML_GZIP = gzip.compress(DOCUMENTATION_HTML, 9)
+DOCUMENTATION_ETAG = (
+    '"' + hashlib.blake2b(DOCUMENTATION_HTML, digest_size=8).hexdigest() + '"'
+)
+DOCUMENTATION_GZIP_ETAG = DOCUMENTATION_ETAG[:-1] + '-gzip"'
 
 
 def signal_handler(sig, frame):
@@ -488,16 +715,21 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
 
     try:
-        # Create and start the server
-        server = HTTPServer((HOST, PORT), RelayModuleHandler)
+        # Claim the GPIO pins for the lifetime of the process
+        setup_gpio()
+
+        # Create and start the server; each connection gets its own thread so
+        # health and status probes are not queued behind other requests
+        server = RelayModuleServer((HOST, PORT), RelayModuleHandler)
         logger.info(f"Starting Raspberry Pi relay module server on {HOST}:{PORT}")
         logger.info("Available endpoints:")
         logger.info("  POST /relay/trigger - Trigger relay on specified GPIO pin")
         logger.info("  GET  /system/health - Health check endpoint")
         logger.info("  GET  /system/status - Service status and configuration")
         logger.info("  GET  /docs          - Interactive API documentation")
-        logger.info(f"Supported GPIO pins: {SUPPORTED_GPIO_PINS}")
+        logger.info(f"Supported GPIO pins: {list(SUPPORTED_GPIO_PINS)}")
         logger.info(f"Pulse duration: {PULSE_DURATION}s")
+        logger.info(f"Authorization algorithm: {AUTH_ALGORITHM}")
         logger.info("Set RELAY_SECRET in .env file for authorization")
 
         server.serve_forever()
@@ -508,8 +740,10 @@ def main():
         logger.error(f"Server error: {e}")
         sys.exit(1)
     finally:
-        # Clean up GPIO on exit
+        # Let in-flight pulses finish, then clean up GPIO on exit
         try:
+            for executor in PULSE_EXECUTORS.values():
+                executor.shutdown(wait=True)
             GPIO.cleanup()
         except:
             pass
@@ -13,15 +13,20 @@ load_dotenv()
 # Configuration
 BASE_URL = "http://localhost:8080"
 SECRET = os.environ.get("RELAY_SECRET")
+AUTH_ALGORITHM = os.environ.get("RELAY_AUTH_ALGORITHM", "hmac-sha256")
 if not SECRET:
     print("❌ RELAY_SECRET not found in .env file or environment variables")
     print("   Please ensure .env file exists with RELAY_SECRET set")
     exit(1)
+SECRET_BYTES = SECRET.encode()
 
 
 def generate_auth_hash(body):
-    """Generate HMAC-SHA256 hash for authorization"""
-    return hmac.new(SECRET.encode(), body.encode(), hashlib.sha256).hexdigest()
+    """Generate the authorization hash (HMAC-SHA256 or keyed BLAKE2s)"""
+    if AUTH_ALGORITHM == "blake2s":
+        key = hashlib.sha256(SECRET_BYTES).digest()
+        return hashlib.blake2s(body.encode(), key=key).hexdigest()
+    return hmac.new(SECRET_BYTES, body.encode(), hashlib.sha256).hexdigest()
 
 
 def trigger_relay(gpio_pin):
@@ -45,7 +50,7 @@ def trigger_relay(gpio_pin):
         response = requests.post(url, data=body, headers=headers)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.json()}")
-        return response.status_code == 200
+        return response.status_code == 202
     except Exception as e:
         print(f"Error: {e}")
         return False